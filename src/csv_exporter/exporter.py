@@ -5,6 +5,20 @@ from __future__ import annotations
 import csv
 from pathlib import Path
 
+# Output buffer size; large enough that most exports are a single write syscall
+WRITE_BUFFER_SIZE = 1 << 20
+
+# Row terminator used by csv.writer's default dialect
+CSV_LINE_TERMINATOR = "\r\n"
+
+
+def _ensure_parent_dir(output_path: Path) -> None:
+    """Create the output file's parent directory if it doesn't exist yet."""
+    # A single stat in the common case, rather than always attempting mkdir
+    parent = output_path.parent
+    if not parent.exists():
+        parent.mkdir(parents=True, exist_ok=True)
+
 
 class CSVExporter:
     """Export tags to CSV format."""
@@ -24,22 +38,26 @@ class CSVExporter:
             output_path: Path to the output CSV file
             include_header: Whether to include a header row
             header_name: Name of the header column
+
+        Tags and the header are written without CSV quoting, so they must not
+        contain commas, quotes or newlines (extracted tags never do).
         """
-        output_path = Path(output_path)
+        if not isinstance(output_path, Path):
+            output_path = Path(output_path)
 
         # Ensure parent directory exists
-        output_path.parent.mkdir(parents=True, exist_ok=True)
+        _ensure_parent_dir(output_path)
 
-        with open(output_path, 'w', newline='', encoding='utf-8') as csvfile:
-            writer = csv.writer(csvfile)
+        # A single column needs no delimiters or quoting, so skip csv.writer
+        # and write the rows as one joined string (CRLF, as csv.writer does)
+        rows = [header_name, *tags] if include_header else list(tags)
 
-            # Write header if requested
-            if include_header:
-                writer.writerow([header_name])
-
-            # Write each tag as a row
-            for tag in tags:
-                writer.writerow([tag])
+        with open(
+            output_path, 'w', encoding='utf-8', buffering=WRITE_BUFFER_SIZE, newline=''
+        ) as csvfile:
+            if rows:
+                csvfile.write(CSV_LINE_TERMINATOR.join(rows))
+                csvfile.write(CSV_LINE_TERMINATOR)
 
     @staticmethod
     def export_tags_with_counts(
@@ -55,21 +73,20 @@ class CSVExporter:
             output_path: Path to the output CSV file
             include_header: Whether to include a header row
         """
-        output_path = Path(output_path)
+        if not isinstance(output_path, Path):
+            output_path = Path(output_path)
 
         # Ensure parent directory exists
-        output_path.parent.mkdir(parents=True, exist_ok=True)
+        _ensure_parent_dir(output_path)
 
-        with open(output_path, 'w', newline='', encoding='utf-8') as csvfile:
+        with open(
+            output_path, 'w', encoding='utf-8', buffering=WRITE_BUFFER_SIZE, newline=''
+        ) as csvfile:
             writer = csv.writer(csvfile)
 
             # Write header if requested
             if include_header:
                 writer.writerow(["Tag", "Count"])
 
-            # Sort by tag name
-            sorted_tags = sorted(tag_counts.items())
-
-            # Write each tag and count
-            for tag, count in sorted_tags:
-                writer.writerow([tag, count])
+            # Write each tag and count in one batch, sorted by tag name
+            writer.writerows(sorted(tag_counts.items()))
@@ -159,14 +159,23 @@ class MainWindow(ctk.CTk):
             # Update status
             self.status_label.configure(text="Extracting text from PDF...")
 
-            # Extract text from PDF
+            # Stream page text from the PDF into the tag extractor,
+            # so tags are identified while later pages are still being OCR'd
             pdf_extractor = PDFExtractor(self.pdf_path)
-            text = pdf_extractor.extract_text()
-
-            # Extract tags
-            self.status_label.configure(text="Identifying tags...")
-            tag_extractor = TagExtractor(text)
-            self.extracted_tags = tag_extractor.extract_all_tags(deduplicate=True)
+            tag_extractor = TagExtractor()
+
+            def pages_with_progress():
+                for page_text in pdf_extractor.iter_page_text():
+                    yield page_text
+                    tags_found = len(tag_extractor.tag_categories)
+                    self.status_label.configure(
+                        text=f"Identifying tags... {tags_found} unique tags so far"
+                    )
+
+            with pdf_extractor:
+                self.extracted_tags = tag_extractor.extract_from_iter(
+                    pages_with_progress(), deduplicate=True
+                )
             self.tag_summary = tag_extractor.get_summary()
 
             # Update UI with results
@@ -222,7 +231,7 @@ Tags (showing first 50):
             output_path = self.output_dir / default_filename
 
             # Confirm overwrite if file exists
-            if Path(output_path).exists():
+            if output_path.exists():
                 if not messagebox.askyesno("Confirm", f"File already exists:\n{output_path}\n\nOverwrite?"):
                     return
         else:
@@ -234,13 +243,14 @@ Tags (showing first 50):
             )
             if not output_path:
                 return
+            output_path = Path(output_path)
 
         try:
             # Export to CSV
             CSVExporter.export_tags(self.extracted_tags, output_path)
 
             # Update status
-            self.status_label.configure(text=f"Exported to {Path(output_path).name}")
+            self.status_label.configure(text=f"Exported to {output_path.name}")
 
             messagebox.showinfo(
                 "Success",
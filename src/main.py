@@ -1,5 +1,7 @@
 """Main entry point for PID-Tag Puller application."""
 
+import multiprocessing
+
 from gui.main_window import MainWindow
 
 
@@ -19,4 +21,6 @@ def main():
 
 
 if __name__ == "__main__":
+    # Required for OCR worker processes in PyInstaller builds
+    multiprocessing.freeze_support()
     main()
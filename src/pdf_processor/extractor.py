@@ -1,22 +1,199 @@
-from __future__ import annotations
 """PDF text extraction using pdfplumber and OCR."""
 
+from __future__ import annotations
+
 import pdfplumber
 import fitz  # PyMuPDF
 import pytesseract
 from PIL import Image
 from pathlib import Path
-import io
+from collections.abc import Iterator
+from concurrent.futures import Future, ProcessPoolExecutor
+from functools import cache, cached_property, partial
+import hashlib
+import multiprocessing
+import os
+import tempfile
+
+from tag_extractor.patterns import iter_tag_matches
+
+# Environment variable to cap the number of OCR worker processes
+OCR_WORKERS_ENV = "PID_TAG_OCR_WORKERS"
+
+# On-disk OCR cache. Entries are keyed by PDF content hash, cache format
+# version and Tesseract version, so edits and upgrades are re-OCR'd.
+OCR_CACHE_DIR = Path(tempfile.gettempdir()) / "pid_tag_ocr"
+
+# Bump when a change to the OCR pipeline makes cached text stale
+OCR_CACHE_VERSION = 1
+
+# Environment variable to disable the OCR cache when set to "0"
+OCR_CACHE_ENV = "PID_TAG_OCR_CACHE"
+
+# Pages whose grayscale render spans fewer levels than this are treated as blank
+BLANK_PAGE_CONTRAST = 20
+
+# Run a supplementary sparse-text OCR pass on pages where the main pass
+# finds fewer tag-shaped tokens than this
+SUPPLEMENT_OCR_TAG_THRESHOLD = 10
+
+
+def _default_ocr_workers() -> int:
+    """Get the OCR worker count from the environment, or the CPU count."""
+    env_value = os.environ.get(OCR_WORKERS_ENV)
+    if env_value:
+        try:
+            return max(1, int(env_value))
+        except ValueError:
+            pass
+    return os.cpu_count() or 1
+
+
+def _ocr_cache_enabled() -> bool:
+    """Check whether the OCR cache has been disabled in the environment."""
+    return os.environ.get(OCR_CACHE_ENV) != "0"
+
+
+@cache
+def _tesseract_version() -> str:
+    """Get the installed Tesseract version, once per process."""
+    try:
+        return str(pytesseract.get_tesseract_version())
+    except pytesseract.TesseractNotFoundError:
+        return "unknown"
+
+
+def _ocr_one_page(
+    pdf_path: str | Path,
+    page_num: int,
+    zoom: float = 2.0,
+    psm: int = 6,
+    supplement_psm: int | None = 11
+) -> str:
+    """
+    Open a PDF and run OCR on a single page.
+
+    Module-level so it can be pickled and run in a worker process. Each call
+    opens its own document handle, since fitz documents can't cross processes.
+
+    Args:
+        pdf_path: Path to the PDF file
+        page_num: Zero-based index of the page to OCR
+        zoom: Render scale (2.0 means 144 DPI instead of 72 DPI)
+        psm: Tesseract page segmentation mode for the main pass
+        supplement_psm: Mode for a second pass, run only if the main pass finds
+            fewer than SUPPLEMENT_OCR_TAG_THRESHOLD tag-shaped tokens
+
+    Returns:
+        str: OCR text for the page
+    """
+    with fitz.open(pdf_path) as doc:
+        return _ocr_page(doc[page_num], zoom, psm, supplement_psm)
+
+
+def _ocr_page(
+    page: fitz.Page,
+    zoom: float = 2.0,
+    psm: int = 6,
+    supplement_psm: int | None = 11
+) -> str:
+    """
+    Render a PDF page and run OCR on it.
+
+    Args:
+        page: Page of an open fitz document
+        zoom: Render scale (2.0 means 144 DPI instead of 72 DPI)
+        psm: Tesseract page segmentation mode for the main pass
+        supplement_psm: Mode for a second pass, run only if the main pass finds
+            fewer than SUPPLEMENT_OCR_TAG_THRESHOLD tag-shaped tokens
+
+    Returns:
+        str: OCR text for the page
+    """
+    # Render page to image at high resolution for better OCR. Tesseract
+    # binarizes internally, so rendering straight to single-channel grayscale
+    # loses nothing and passes a third of the bytes of RGB
+    mat = fitz.Matrix(zoom, zoom)
+    pix = page.get_pixmap(matrix=mat, colorspace=fitz.csGRAY, alpha=False)
+
+    # Build the PIL Image straight from the raw pixel buffer,
+    # avoiding a PNG encode/decode round-trip
+    gray = Image.frombytes("L", (pix.width, pix.height), pix.samples)
+
+    # Skip Tesseract on blank or near-blank pages (separators, back covers)
+    darkest, lightest = gray.getextrema()
+    if lightest - darkest < BLANK_PAGE_CONTRAST:
+        return ""
+
+    # PSM 6 (uniform block) is better for engineering diagrams
+    page_text = pytesseract.image_to_string(gray, config=f'--oem 3 --psm {psm}')
+
+    # PSM 11 (sparse text) catches scattered tags, but doubles OCR time,
+    # so only run it when the main pass found few tags
+    if supplement_psm is not None:
+        tag_count = sum(1 for _ in iter_tag_matches(page_text))
+        if tag_count < SUPPLEMENT_OCR_TAG_THRESHOLD:
+            page_text_sparse = pytesseract.image_to_string(
+                gray, config=f'--oem 3 --psm {supplement_psm}'
+            )
+            page_text = page_text + "\n" + page_text_sparse
+
+    return page_text
 
 
 class PDFExtractor:
     """Extract text from PDF files using text extraction and OCR."""
 
-    def __init__(self, pdf_path: str | Path):
-        """Initialize with path to PDF file."""
+    def __init__(self, pdf_path: str | Path, max_workers: int | None = None):
+        """
+        Initialize with path to PDF file.
+
+        Args:
+            pdf_path: Path to the PDF file
+            max_workers: Maximum OCR worker processes. Defaults to the
+                PID_TAG_OCR_WORKERS environment variable, or the CPU count.
+        """
         self.pdf_path = Path(pdf_path)
         if not self.pdf_path.exists():
             raise FileNotFoundError(f"PDF file not found: {pdf_path}")
+        self.max_workers = max_workers if max_workers else _default_ocr_workers()
+
+    @cached_property
+    def _key(self) -> str:
+        """OCR cache key: the PDF content hash, salted with the cache and Tesseract versions."""
+        digest = hashlib.blake2b(self.pdf_path.read_bytes(), digest_size=16)
+        digest.update(f"{OCR_CACHE_VERSION}:{_tesseract_version()}".encode())
+        return digest.hexdigest()
+
+    @cached_property
+    def _fitz_doc(self) -> fitz.Document:
+        """PyMuPDF document, opened on first use and shared by all code paths."""
+        return fitz.open(self.pdf_path)
+
+    @cached_property
+    def _plumber_doc(self) -> pdfplumber.PDF:
+        """pdfplumber document, opened on first use and shared by all code paths."""
+        return pdfplumber.open(self.pdf_path)
+
+    def close(self) -> None:
+        """Close any open document handles."""
+        for attr in ("_fitz_doc", "_plumber_doc"):
+            doc = self.__dict__.pop(attr, None)
+            if doc is not None:
+                doc.close()
+
+    def __enter__(self) -> PDFExtractor:
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            # Interpreter may be shutting down with the libraries half torn down
+            pass
 
     def extract_text(self, use_ocr: bool = True, min_text_threshold: int = 200) -> str:
         """
@@ -29,72 +206,248 @@ class PDFExtractor:
         Returns:
             str: All text content from all pages concatenated
         """
-        # First, try standard text extraction
-        text_extracted = self._extract_text_standard()
+        return "\n".join(self.iter_page_text(use_ocr, min_text_threshold))
 
-        # If we got enough text, return it
-        if len(text_extracted) >= min_text_threshold:
-            return text_extracted
+    def iter_page_text(
+        self,
+        use_ocr: bool = True,
+        min_text_threshold: int = 200
+    ) -> Iterator[str]:
+        """
+        Yield text page by page using text extraction and/or OCR.
 
-        # Otherwise, use OCR if enabled
-        if use_ocr:
-            print(f"Minimal text found ({len(text_extracted)} chars). Using OCR...")
-            ocr_text = self._extract_text_ocr()
-            # Combine both (in case some text was extractable)
-            combined = text_extracted + "\n" + ocr_text
-            return combined
-        else:
-            return text_extracted
+        Same fallback rules as extract_text(), but OCR pages are yielded as
+        soon as they are ready, so callers can start on page 1 while later
+        pages are still being OCR'd.
 
-    def _extract_text_standard(self) -> str:
-        """Extract text using standard pdfplumber extraction."""
-        all_text = []
+        Args:
+            use_ocr: Whether to use OCR if minimal text is found
+            min_text_threshold: Minimum characters to consider adequate text extraction
 
-        with pdfplumber.open(self.pdf_path) as pdf:
-            for page in pdf.pages:
-                text = page.extract_text()
+        Yields:
+            str: Text content of one page
+        """
+        if not use_ocr:
+            for text in self._extract_text_by_page_standard():
                 if text:
-                    all_text.append(text)
-
-        return "\n".join(all_text)
-
-    def _extract_text_ocr(self) -> str:
-        """Extract text from PDF images using OCR."""
-        all_text = []
-
-        # Use PyMuPDF to extract images and render pages
-        doc = fitz.open(self.pdf_path)
-
-        for page_num in range(len(doc)):
-            page = doc[page_num]
-
-            # Render page to image at high resolution for better OCR
-            # zoom=2.0 means 2x resolution (144 DPI instead of 72 DPI)
-            mat = fitz.Matrix(2.0, 2.0)
-            pix = page.get_pixmap(matrix=mat)
-
-            # Convert to PIL Image
-            img_data = pix.tobytes("png")
-            img = Image.open(io.BytesIO(img_data))
-
-            # Perform OCR with multiple configurations for better coverage
-            # Try PSM 6 (uniform block) first - better for engineering diagrams
-            custom_config = r'--oem 3 --psm 6'
-            page_text = pytesseract.image_to_string(img, config=custom_config)
+                    yield text
+            return
+
+        # Scanned P&IDs (the common case) need OCR anyway, so start it in the
+        # worker pool straight away and run standard extraction meanwhile.
+        # A quick fitz text check keeps PDFs with selectable text from
+        # starting OCR they will never use.
+        # PSM 6, supplemented by PSM 11 on pages with few tags
+        executor, pending = None, None
+        if not self._has_selectable_text(min_text_threshold):
+            executor, pending = self._submit_ocr_pages(
+                zoom=2.0, psm=6, supplement_psm=11, speculative=True
+            )
+        try:
+            # First, try standard text extraction
+            standard_pages = [text for text in self._extract_text_by_page_standard() if text]
+            yield from standard_pages
+
+            text_length = len("\n".join(standard_pages))
+
+            # If we got enough text, stop there (any speculative OCR is cancelled).
+            # Otherwise, add the OCR text, keeping the standard text in case
+            # some was extractable
+            if text_length >= min_text_threshold:
+                return
+
+            print(f"Minimal text found ({text_length} chars). Using OCR...")
+            if pending is None:
+                executor, pending = self._submit_ocr_pages(zoom=2.0, psm=6, supplement_psm=11)
+            for text in self._collect_ocr_pages(pending, zoom=2.0, psm=6, supplement_psm=11):
+                if text:
+                    yield text
+        finally:
+            self._shutdown_ocr(executor)
+
+    def _has_selectable_text(self, min_chars: int) -> bool:
+        """Quickly check with fitz whether the PDF has at least min_chars of text."""
+        text_length = 0
+        for page in self._fitz_doc:
+            text_length += len(page.get_text().strip())
+            if text_length >= min_chars:
+                return True
+        return False
+
+    def _ocr_pages(
+        self,
+        zoom: float,
+        psm: int,
+        supplement_psm: int | None = None
+    ) -> list[str]:
+        """
+        OCR every page in parallel across worker processes.
 
-            # Also try PSM 11 (sparse text) to catch scattered tags
-            custom_config_sparse = r'--oem 3 --psm 11'
-            page_text_sparse = pytesseract.image_to_string(img, config=custom_config_sparse)
+        Returns:
+            list[str]: OCR text, one entry per page in page order
+        """
+        return list(self._iter_ocr_pages(zoom, psm, supplement_psm))
+
+    def _iter_ocr_pages(
+        self,
+        zoom: float,
+        psm: int,
+        supplement_psm: int | None = None
+    ) -> Iterator[str]:
+        """
+        OCR every page in parallel across worker processes, yielding in page order.
 
-            # Combine both results
-            page_text = page_text + "\n" + page_text_sparse
+        Pages already in the on-disk OCR cache are read from it instead.
 
-            if page_text:
-                all_text.append(page_text)
+        Yields:
+            str: OCR text for each page, in page order
+        """
+        executor, pending = self._submit_ocr_pages(zoom, psm, supplement_psm)
+        try:
+            yield from self._collect_ocr_pages(pending, zoom, psm, supplement_psm)
+        finally:
+            self._shutdown_ocr(executor)
+
+    def _submit_ocr_pages(
+        self,
+        zoom: float,
+        psm: int,
+        supplement_psm: int | None = None,
+        speculative: bool = False
+    ) -> tuple[ProcessPoolExecutor | None, list[str | Future | None]]:
+        """
+        Start OCR of every page that isn't in the OCR cache.
 
-        doc.close()
+        Args:
+            speculative: Whether the OCR should run in the background while the
+                caller does other work. A single uncached page then still gets
+                a worker pool; otherwise it is OCR'd inline when collected.
 
-        return "\n".join(all_text)
+        Returns:
+            tuple: The worker pool, or None if no pool is needed (pages are then
+                OCR'd inline when collected), and one entry per page: the cached
+                text, a Future for the OCR text, or None
+        """
+        pending = [
+            self._read_ocr_cache(page_num, zoom, psm, supplement_psm)
+            for page_num in range(len(self._fitz_doc))
+        ]
+        uncached = [page_num for page_num, text in enumerate(pending) if text is None]
+
+        # Single page or single worker: skip the process pool overhead,
+        # unless the page has to be OCR'd in the background
+        min_pages = 1 if speculative else 2
+        if self.max_workers == 1 or len(uncached) < min_pages:
+            return None, pending
+
+        # Spawn on every platform, so workers start the same way they do
+        # in the frozen Windows build
+        executor = ProcessPoolExecutor(
+            max_workers=min(self.max_workers, len(uncached)),
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+        for page_num in uncached:
+            future = executor.submit(
+                _ocr_one_page, self.pdf_path, page_num, zoom, psm, supplement_psm
+            )
+            # Cache each page as it finishes, so pages that were still running
+            # when the pool was shut down are not wasted
+            future.add_done_callback(
+                partial(self._cache_ocr_future, page_num, zoom, psm, supplement_psm)
+            )
+            pending[page_num] = future
+
+        return executor, pending
+
+    def _collect_ocr_pages(
+        self,
+        pending: list[str | Future | None],
+        zoom: float,
+        psm: int,
+        supplement_psm: int | None = None
+    ) -> Iterator[str]:
+        """Yield OCR text from _submit_ocr_pages() in page order, caching new results."""
+        for page_num, result in enumerate(pending):
+            if isinstance(result, str):
+                yield result
+                continue
+            if result is None:
+                result = _ocr_page(self._fitz_doc[page_num], zoom, psm, supplement_psm)
+            else:
+                # _cache_ocr_future() may not have run yet, so cache it here
+                # too; the atomic write makes a second copy harmless
+                result = result.result()
+            self._write_ocr_cache(page_num, zoom, psm, supplement_psm, result)
+            yield result
+
+    def _cache_ocr_future(
+        self,
+        page_num: int,
+        zoom: float,
+        psm: int,
+        supplement_psm: int | None,
+        future: Future
+    ) -> None:
+        """Write the result of a finished OCR future to the cache."""
+        if not future.cancelled() and future.exception() is None:
+            self._write_ocr_cache(page_num, zoom, psm, supplement_psm, future.result())
+
+    @staticmethod
+    def _shutdown_ocr(executor: ProcessPoolExecutor | None) -> None:
+        """Shut down an OCR pool, dropping queued pages without waiting for running ones."""
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _ocr_cache_path(
+        self,
+        page_num: int,
+        zoom: float,
+        psm: int,
+        supplement_psm: int | None
+    ) -> Path:
+        """Get the OCR cache file for a page and OCR configuration."""
+        return OCR_CACHE_DIR / f"{self._key}_{page_num}_{zoom}_{psm}_{supplement_psm}.txt"
+
+    def _read_ocr_cache(
+        self,
+        page_num: int,
+        zoom: float,
+        psm: int,
+        supplement_psm: int | None
+    ) -> str | None:
+        """Read cached OCR text for a page, or None if not cached."""
+        if not _ocr_cache_enabled():
+            return None
+        try:
+            return self._ocr_cache_path(page_num, zoom, psm, supplement_psm).read_text(
+                encoding="utf-8"
+            )
+        except OSError:
+            return None
+
+    def _write_ocr_cache(
+        self,
+        page_num: int,
+        zoom: float,
+        psm: int,
+        supplement_psm: int | None,
+        text: str
+    ) -> None:
+        """Atomically write OCR text for a page to the cache."""
+        if not _ocr_cache_enabled():
+            return
+        cache_path = self._ocr_cache_path(page_num, zoom, psm, supplement_psm)
+        try:
+            OCR_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            # Write to a temporary file and rename so readers never see partial text
+            with tempfile.NamedTemporaryFile(
+                "w", encoding="utf-8", dir=OCR_CACHE_DIR, suffix=".tmp", delete=False
+            ) as tmp_file:
+                tmp_file.write(text)
+            os.replace(tmp_file.name, cache_path)
+        except OSError:
+            # Caching is best-effort; a read-only temp dir shouldn't break extraction
+            pass
 
     def extract_text_by_page(self, use_ocr: bool = True) -> list[str]:
         """
@@ -115,34 +468,21 @@ class PDFExtractor:
         """Extract text by page using standard extraction."""
         pages_text = []
 
-        with pdfplumber.open(self.pdf_path) as pdf:
-            for page in pdf.pages:
-                text = page.extract_text()
-                pages_text.append(text if text else "")
+        for page in self._plumber_doc.pages:
+            text = page.extract_text()
+            # Free the page's parsed layout objects before moving on
+            page.close()
+            pages_text.append(text if text else "")
 
         return pages_text
 
     def _extract_text_by_page_ocr(self) -> list[str]:
         """Extract text by page using OCR."""
-        pages_text = []
-        doc = fitz.open(self.pdf_path)
-
-        for page_num in range(len(doc)):
-            page = doc[page_num]
-            mat = fitz.Matrix(2.0, 2.0)
-            pix = page.get_pixmap(matrix=mat)
-
-            img_data = pix.tobytes("png")
-            img = Image.open(io.BytesIO(img_data))
-
-            custom_config = r'--oem 3 --psm 11'
-            page_text = pytesseract.image_to_string(img, config=custom_config)
-            pages_text.append(page_text if page_text else "")
-
-        doc.close()
-        return pages_text
+        # 1.5x (108 DPI) is enough for per-page sparse text and
+        # renders about half the pixels of 2x
+        pages_text = self._ocr_pages(zoom=1.5, psm=11)
+        return [text if text else "" for text in pages_text]
 
     def get_page_count(self) -> int:
         """Get the number of pages in the PDF."""
-        with pdfplumber.open(self.pdf_path) as pdf:
-            return len(pdf.pages)
+        return len(self._plumber_doc.pages)
@@ -2,18 +2,27 @@
 
 from __future__ import annotations
 
-from collections import Counter
-from tag_extractor.patterns import COMPILED_PATTERNS, is_excluded, is_likely_tag
+from collections import Counter, defaultdict
+from collections.abc import Iterable
+from tag_extractor.patterns import (
+    MAX_TAG_LENGTH,
+    TAG_CATEGORIES,
+    is_excluded,
+    iter_tag_matches,
+)
 
 
 class TagExtractor:
     """Extract equipment, valve, and instrument tags from P&ID text."""
 
-    def __init__(self, text: str):
-        """Initialize with text content from PDF."""
+    def __init__(self, text: str = ""):
+        """Initialize with text content from PDF (optional when streaming pages)."""
         self.text = text
-        self.tags = []
-        self.tag_counts = Counter()
+        # Plain defaultdict for speed in the scan loop. Kept private, since a
+        # lookup of a missing tag would insert it; get_tag_counts() gives a Counter
+        self._tag_counts: defaultdict[str, int] = defaultdict(int)
+        # Category of each tag, from the pattern that matched it
+        self.tag_categories: dict[str, str] = {}
 
     def extract_all_tags(self, deduplicate: bool = True) -> list[str]:
         """
@@ -25,29 +34,61 @@ class TagExtractor:
         Returns:
             list[str]: List of extracted tags
         """
-        self.tags = []
+        return self.extract_from_iter([self.text], deduplicate=deduplicate)
 
-        # Extract tags using each pattern
-        for tag_type, pattern in COMPILED_PATTERNS.items():
-            matches = pattern.findall(self.text)
-            for match in matches:
-                # Additional validation
-                if is_likely_tag(match) and not is_excluded(match):
-                    self.tags.append(match)
-                    self.tag_counts[match] += 1
+    def extract_from_iter(self, pages: Iterable[str], deduplicate: bool = True) -> list[str]:
+        """
+        Extract all tags from text supplied page by page.
+
+        Each page is scanned as it arrives, so pages can be streamed from
+        PDFExtractor.iter_page_text() without holding the whole document's text.
+        tag_categories fills in as pages are scanned, so callers can track progress.
+
+        Args:
+            pages: Iterable of page text
+            deduplicate: If True, return unique tags only. If False, include duplicates.
+
+        Returns:
+            list[str]: List of extracted tags
+        """
+        self._tag_counts = defaultdict(int)
+        self.tag_categories = {}
+
+        for page_text in pages:
+            self._scan_text(page_text)
 
         # Special handling for short pump tags (P####) to avoid false positives
         # Only keep if not part of a sheet number pattern
-        self.tags = self._filter_short_pump_tags(self.tags)
+        self._tag_counts = self._filter_short_pump_tags(self._tag_counts)
 
         if deduplicate:
             # Return unique tags, sorted
-            return sorted(set(self.tags))
+            return sorted(self._tag_counts)
         else:
             # Return all tags (including duplicates), sorted
-            return sorted(self.tags)
-
-    def _filter_short_pump_tags(self, tags: list[str]) -> list[str]:
+            return sorted(self.get_tag_counts().elements())
+
+    def _scan_text(self, text: str) -> None:
+        """Find tags in a block of text and add them to the counts and tag_categories."""
+        # Bind to locals to skip attribute and global lookups in the loop
+        counts = self._tag_counts
+        categories = self.tag_categories
+        excluded = is_excluded
+        max_length = MAX_TAG_LENGTH
+
+        # Extract tags with a single scan over the text
+        for tag_type, tag in iter_tag_matches(text):
+            # Additional validation. Pattern matches are always uppercase, so
+            # is_likely_tag() reduces to the length check here.
+            if len(tag) <= max_length and not excluded(tag):
+                counts[tag] += 1
+                if tag not in categories:
+                    categories[tag] = TAG_CATEGORIES[tag_type]
+
+    def _filter_short_pump_tags(
+        self,
+        tag_counts: defaultdict[str, int]
+    ) -> defaultdict[str, int]:
         """
         Filter out short pump tags (P####) that are likely part of sheet numbers.
 
@@ -56,16 +97,18 @@ class TagExtractor:
         """
         # For now, keep all P#### tags that passed initial validation
         # More sophisticated filtering could check context in the text
-        return tags
+        return tag_counts
 
-    def get_tag_counts(self) -> dict[str, int]:
+    def get_tag_counts(self) -> Counter:
         """Get counts of how many times each tag appears."""
-        return dict(self.tag_counts)
+        return Counter(self._tag_counts)
 
     def get_tags_by_type(self) -> dict[str, list[str]]:
         """
         Categorize tags by type.
 
+        Categories come from the pattern that matched each tag; see TAG_CATEGORIES.
+
         Returns:
             dict: Dictionary with tag types as keys and lists of tags as values
         """
@@ -77,17 +120,9 @@ class TagExtractor:
             "other": []
         }
 
-        for tag in set(self.tags):
-            if tag.startswith("STORM_P") or (tag.startswith("P") and len(tag) == 5):
-                categorized["pumps"].append(tag)
-            elif tag.startswith("VLV"):
-                categorized["valves"].append(tag)
-            elif "-" in tag and len(tag.split("-")) >= 3:
-                categorized["instruments"].append(tag)
-            elif "TRAP" in tag or "TANK" in tag:
-                categorized["equipment"].append(tag)
-            else:
-                categorized["other"].append(tag)
+        tag_categories = self.tag_categories
+        for tag in self._tag_counts:
+            categorized[tag_categories[tag]].append(tag)
 
         # Sort each category
         for category in categorized:
@@ -105,8 +140,8 @@ class TagExtractor:
         tags_by_type = self.get_tags_by_type()
 
         return {
-            "total_unique": len(set(self.tags)),
-            "total_instances": len(self.tags),
+            "total_unique": len(self._tag_counts),
+            "total_instances": sum(self._tag_counts.values()),
             "pumps": len(tags_by_type["pumps"]),
             "valves": len(tags_by_type["valves"]),
             "instruments": len(tags_by_type["instruments"]),
@@ -0,0 +1,51 @@
+"""Tests for CSV export functionality."""
+
+from src.csv_exporter.exporter import CSVExporter
+
+
+def test_export_tags_with_header(tmp_path):
+    """Test that tags are written one per row under the header, with CRLF endings."""
+    output_path = tmp_path / "tags.csv"
+
+    CSVExporter.export_tags(["A", "B"], output_path)
+
+    assert output_path.read_bytes() == b"Tag\r\nA\r\nB\r\n"
+
+
+def test_export_tags_without_header(tmp_path):
+    """Test that the header row can be left out."""
+    output_path = tmp_path / "tags.csv"
+
+    CSVExporter.export_tags(["A", "B"], output_path, include_header=False)
+
+    assert output_path.read_bytes() == b"A\r\nB\r\n"
+
+
+def test_export_empty_tag_list(tmp_path):
+    """Test that an empty tag list gives just the header, or an empty file."""
+    with_header = tmp_path / "with_header.csv"
+    without_header = tmp_path / "without_header.csv"
+
+    CSVExporter.export_tags([], with_header)
+    CSVExporter.export_tags([], without_header, include_header=False)
+
+    assert with_header.read_bytes() == b"Tag\r\n"
+    assert without_header.read_bytes() == b""
+
+
+def test_export_creates_parent_directories(tmp_path):
+    """Test that missing parent directories of the output file are created."""
+    output_path = tmp_path / "nested" / "dir" / "tags.csv"
+
+    CSVExporter.export_tags(["A"], str(output_path))
+
+    assert output_path.read_bytes() == b"Tag\r\nA\r\n"
+
+
+def test_export_tags_with_counts(tmp_path):
+    """Test that tag counts are written sorted by tag, matching csv.writer output."""
+    output_path = tmp_path / "counts.csv"
+
+    CSVExporter.export_tags_with_counts({"B": 2, "A": 1}, output_path)
+
+    assert output_path.read_bytes() == b"Tag,Count\r\nA,1\r\nB,2\r\n"
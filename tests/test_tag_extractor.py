@@ -2,17 +2,45 @@
 
 import pytest
 from pathlib import Path
+import fitz
+from src.pdf_processor import extractor as pdf_module
 from src.pdf_processor.extractor import PDFExtractor
 from src.tag_extractor.extractor import TagExtractor
 
 
-def test_pdf_extractor_with_test_material():
+@pytest.fixture
+def make_pdf(tmp_path, monkeypatch):
+    """
+    Build PDFs in tmp_path, with the OCR cache redirected to tmp_path too.
+
+    Returns a function taking a page count and optional page text.
+    """
+    monkeypatch.setattr(pdf_module, "OCR_CACHE_DIR", tmp_path / "cache")
+
+    def _make_pdf(page_count: int, text: str | None = None) -> Path:
+        pdf_path = tmp_path / f"test_{page_count}.pdf"
+        doc = fitz.open()
+        for _ in range(page_count):
+            page = doc.new_page()
+            if text:
+                page.insert_text((72, 72), text)
+        doc.save(pdf_path)
+        doc.close()
+        return pdf_path
+
+    return _make_pdf
+
+
+def test_pdf_extractor_with_test_material(monkeypatch):
     """Test PDF extraction with the reference P&ID."""
     test_pdf = Path("Test_Material/ST0008_P1011-1_3_WIP.pdf")
 
     if not test_pdf.exists():
         pytest.skip("Test material not found")
 
+    # Run the real OCR rather than serving pages from an earlier run
+    monkeypatch.setenv(pdf_module.OCR_CACHE_ENV, "0")
+
     extractor = PDFExtractor(test_pdf)
     text = extractor.extract_text()
 
@@ -21,13 +49,16 @@ def test_pdf_extractor_with_test_material():
     assert "VLV" in text  # Should contain valve tags
 
 
-def test_tag_extraction_with_test_material():
+def test_tag_extraction_with_test_material(monkeypatch):
     """Test tag extraction with the reference P&ID."""
     test_pdf = Path("Test_Material/ST0008_P1011-1_3_WIP.pdf")
 
     if not test_pdf.exists():
         pytest.skip("Test material not found")
 
+    # Run the real OCR rather than serving pages from an earlier run
+    monkeypatch.setenv(pdf_module.OCR_CACHE_ENV, "0")
+
     # Extract text
     pdf_extractor = PDFExtractor(test_pdf)
     text = pdf_extractor.extract_text()
@@ -69,3 +100,215 @@ def test_tag_patterns():
     assert is_excluded("ST0008")  # Drawing number
     assert is_excluded("NOTE 1")  # Note reference
     assert not is_excluded("VLV1001")  # Valid tag
+
+
+def test_combined_pattern_scans_each_tag_once():
+    """Test that the fused pattern reports each tag once with its type."""
+    from src.tag_extractor.patterns import COMBINED_PATTERN
+
+    text = "VLV1001 STORM_P1001-1 P1021 QD-1E-84-1101 FIT1001 KD1 ROCK TRAP 2"
+    matches = [(m.lastgroup, m.group()) for m in COMBINED_PATTERN.finditer(text)]
+
+    assert matches == [
+        ("valve", "VLV1001"),
+        ("pump_storm", "STORM_P1001-1"),
+        ("pump_short", "P1021"),
+        ("instrument", "QD-1E-84-1101"),
+        ("generic_tag", "FIT1001"),
+        ("vendor", "KD1"),
+        ("rock_trap", "ROCK TRAP 2"),
+    ]
+
+
+def test_valve_inside_generic_tag_is_kept():
+    """Test that a valve tag inside a longer generic tag is still reported."""
+    extractor = TagExtractor("XVLV1001")
+
+    assert extractor.extract_all_tags() == ["VLV1001", "XVLV1001"]
+    assert extractor.get_tags_by_type()["valves"] == ["VLV1001"]
+
+
+def test_exclusions_are_anchored():
+    """Test that exclusion patterns only match the whole tag."""
+    from src.tag_extractor.patterns import is_excluded
+
+    assert is_excluded("P1011-1")
+    assert is_excluded("P1011-1-3")
+    assert is_excluded("EXISTING")
+    assert not is_excluded("ST00081")
+    assert not is_excluded("EXISTING PUMP")
+
+
+def test_hyperscan_matches_regex_fallback():
+    """Test that the Hyperscan backend gives the same matches as the re fallback."""
+    from src.tag_extractor import patterns
+
+    if patterns.HYPERSCAN_DATABASE is None:
+        pytest.skip("hyperscan not installed")
+
+    text = (
+        "VLV1001 VLV1001\nSTORM_P1001-12 P1011-1 XVLV10011 "
+        "QD-1E-84-1101 PDIT2345 ABCDE1234 KD1 ROCK TRAP 2\n"
+    )
+    assert list(patterns._iter_hyperscan_matches(text)) == list(
+        patterns._iter_regex_matches(text)
+    )
+
+
+def test_hyperscan_scans_concurrently_from_threads():
+    """Test that Hyperscan scans from several threads at once give the same matches."""
+    from concurrent.futures import ThreadPoolExecutor
+
+    from src.tag_extractor import patterns
+
+    if patterns.HYPERSCAN_DATABASE is None:
+        pytest.skip("hyperscan not installed")
+
+    text = "VLV1001 STORM_P1001-1 P1021 QD-1E-84-1101 FIT1001 KD1\n" * 2000
+    expected = list(patterns._iter_hyperscan_matches(text))
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        results = list(pool.map(
+            lambda _: list(patterns._iter_hyperscan_matches(text)), range(16)
+        ))
+
+    assert all(result == expected for result in results)
+
+
+def test_ocr_results_are_cached(make_pdf, monkeypatch):
+    """Test that repeat OCR of the same PDF is served from the cache."""
+    pdf_path = make_pdf(2)
+
+    calls = []
+
+    def fake_ocr_page(page, zoom, psm, supplement_psm):
+        calls.append(page.number)
+        return f"VLV100{page.number}"
+
+    monkeypatch.setattr(pdf_module, "_ocr_page", fake_ocr_page)
+
+    first = PDFExtractor(pdf_path, max_workers=1).extract_text_by_page()
+    second = PDFExtractor(pdf_path, max_workers=1).extract_text_by_page()
+
+    assert first == second == ["VLV1000", "VLV1001"]
+    assert calls == [0, 1]
+
+
+def test_ocr_cache_can_be_disabled(make_pdf, monkeypatch):
+    """Test that the OCR cache environment variable turns the cache off."""
+    pdf_path = make_pdf(1)
+
+    calls = []
+
+    def fake_ocr_page(page, zoom, psm, supplement_psm):
+        calls.append(page.number)
+        return "VLV1001"
+
+    monkeypatch.setattr(pdf_module, "_ocr_page", fake_ocr_page)
+    monkeypatch.setenv(pdf_module.OCR_CACHE_ENV, "0")
+
+    PDFExtractor(pdf_path, max_workers=1).extract_text_by_page()
+    PDFExtractor(pdf_path, max_workers=1).extract_text_by_page()
+
+    assert calls == [0, 0]
+    assert not pdf_module.OCR_CACHE_DIR.exists()
+
+
+def test_extract_from_iter_matches_joined_text():
+    """Test that streaming pages gives the same tags as the joined text."""
+    pages = ["VLV1001 STORM_P1001-1", "VLV1001 P1021", "NOTE 1 QD-1E-84-1101"]
+
+    streamed = TagExtractor()
+    joined = TagExtractor("\n".join(pages))
+
+    assert streamed.extract_from_iter(iter(pages)) == joined.extract_all_tags()
+    assert streamed.get_tag_counts() == joined.get_tag_counts()
+    assert streamed.get_tag_counts()["VLV1001"] == 2
+
+
+def test_duplicates_counted_once_per_occurrence():
+    """Test that repeated tags are counted per occurrence, not per matching pattern."""
+    extractor = TagExtractor("VLV1001 VLV1001 FIT1001")
+
+    assert extractor.extract_all_tags(deduplicate=True) == ["FIT1001", "VLV1001"]
+    assert extractor.extract_all_tags(deduplicate=False) == ["FIT1001", "VLV1001", "VLV1001"]
+    assert extractor.get_tag_counts() == {"VLV1001": 2, "FIT1001": 1}
+
+    summary = extractor.get_summary()
+    assert summary["total_unique"] == 2
+    assert summary["total_instances"] == 3
+
+
+def test_tags_categorized_by_matching_pattern():
+    """Test that tag categories follow the pattern that matched each tag."""
+    extractor = TagExtractor("STORM_P1001-1 P1021 VLV1001 QD-1E-84-1101 FIT1001 ROCK TRAP 1 KD1")
+    extractor.extract_all_tags()
+
+    assert extractor.get_tags_by_type() == {
+        "pumps": ["P1021", "STORM_P1001-1"],
+        "valves": ["VLV1001"],
+        "instruments": ["FIT1001", "QD-1E-84-1101"],
+        "equipment": ["ROCK TRAP 1"],
+        "other": ["KD1"],
+    }
+
+
+def test_blank_pages_skip_ocr(monkeypatch):
+    """Test that blank pages are not sent to Tesseract."""
+    doc = fitz.open()
+    page = doc.new_page()
+
+    def fail_ocr(*args, **kwargs):
+        raise AssertionError("Tesseract should not run on a blank page")
+
+    monkeypatch.setattr(pdf_module.pytesseract, "image_to_string", fail_ocr)
+
+    assert pdf_module._ocr_page(page) == ""
+
+
+def test_single_page_ocr_skips_process_pool(make_pdf, monkeypatch):
+    """Test that a single-page PDF is OCR'd inline, without a worker pool."""
+    pdf_path = make_pdf(1)
+
+    def no_pool(*args, **kwargs):
+        raise AssertionError("No process pool should be created for one page")
+
+    monkeypatch.setattr(pdf_module, "ProcessPoolExecutor", no_pool)
+    monkeypatch.setattr(pdf_module, "_ocr_page", lambda page, *args: "VLV1001")
+
+    assert PDFExtractor(pdf_path, max_workers=4).extract_text_by_page() == ["VLV1001"]
+
+
+def test_process_pool_keeps_page_order_and_fills_cache(make_pdf):
+    """Test that pooled OCR returns pages in order and caches every page."""
+    pdf_path = make_pdf(3)
+
+    with PDFExtractor(pdf_path, max_workers=3) as pdf_extractor:
+        # Seed the middle page so its text is distinguishable from the blank pages
+        pdf_extractor._write_ocr_cache(1, 1.5, 11, None, "VLV1001")
+        assert pdf_extractor.extract_text_by_page() == ["", "VLV1001", ""]
+
+    assert len(list(pdf_module.OCR_CACHE_DIR.glob("*.txt"))) == 3
+
+
+def test_text_pdf_does_not_start_ocr(make_pdf, monkeypatch):
+    """Test that a PDF with enough selectable text never starts OCR."""
+    pdf_path = make_pdf(2, text="VLV1001 STORM_P1001-1 P1021\n" * 10)
+
+    def no_ocr(*args, **kwargs):
+        raise AssertionError("OCR should not start for a text PDF")
+
+    monkeypatch.setattr(pdf_module, "ProcessPoolExecutor", no_ocr)
+    monkeypatch.setattr(pdf_module, "_ocr_page", no_ocr)
+
+    assert "VLV1001" in PDFExtractor(pdf_path, max_workers=2).extract_text()
+
+
+def test_count_lookup_of_missing_tag_does_not_break_summary():
+    """Test that looking up an unseen tag's count doesn't add it to the results."""
+    extractor = TagExtractor("VLV1001")
+    extractor.extract_all_tags()
+
+    assert extractor.get_tag_counts()["P9999"] == 0
+    assert extractor.get_tags_by_type()["pumps"] == []
+    assert extractor.get_summary()["total_unique"] == 1